@@ -1,5 +1,13 @@
 """
 File for constants
 """
+# IDENTIFIERS are matched with google-re2 when it is installed, so they
+# must stay within RE2 syntax: no backreferences and no lookaround.
 IDENTIFIERS = ["AUTOMOTIVE\n.*\n", "Pb\n.*\n", "RoHS\n.*\n","e3","HALOGEN\nFREE", "GREEN"]
+# Pixel width the rendered ROI is scaled to before OCR. Wide enough for
+# Vision text detection to read part markings reliably, small enough to
+# bound the image bytes sent over the network.
+TARGET_ROI_WIDTH_PX = 1200
+# Upper bound on accepted PDF uploads, which are held in memory.
+MAX_PDF_BYTES = 20 * 1024 * 1024
 GOOGLE_APPLICATION_CREDENTIALS_PATH = "creds.json"
@@ -0,0 +1,15 @@
+"""
+Gunicorn configuration for serving the application in production.
+
+Usage: gunicorn -c gunicorn_conf.py application:application
+
+Quart is an ASGI app, so gunicorn runs it through uvicorn's worker class;
+each worker's event loop overlaps many in-flight Vision round-trips, and
+multiple workers use the remaining CPU cores for rasterization.
+"""
+import os
+
+bind = "0.0.0.0:8000"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = 2 * (os.cpu_count() or 1) + 1
+worker_connections = 1000
@@ -0,0 +1,84 @@
+"""
+Hot-path helpers for mapping OCR text to identifier classes.
+
+This module is self-contained and fully type-annotated so it can
+optionally be compiled to a C extension with mypyc
+(`pip install mypy && mypyc ocr_utils.py`), turning the per-request loop
+and dict handling into C-level dispatch. application.py imports it the
+same way whether or not the compiled extension is present.
+"""
+import re
+from typing import Any
+
+import orjson
+
+try:
+    # google-re2 compiles to a linear-time DFA with literal prefilters and
+    # cannot backtrack catastrophically; its API mirrors the stdlib module.
+    # It ships no py.typed marker, hence the ignore.
+    import re2  # type: ignore[import-untyped]
+except ImportError:
+    re2 = re
+
+from constants import IDENTIFIERS
+
+# Class-name keys and the empty result dict are built once at import so
+# ocr_to_dict does no f-string formatting per request, just a dict copy.
+_CLASS_KEYS: tuple[str, ...] = tuple(f"class_{i}" for i in range(len(IDENTIFIERS)))
+_TEMPLATE: dict[str, str | None] = dict.fromkeys(_CLASS_KEYS)
+
+# Translation table mapping newlines to dashes in matched identifiers;
+# built once so each match is cleaned in a single C-level pass.
+_NL_TABLE: dict[int, str] = str.maketrans({"\n": "-"})
+
+# The identifier patterns are compiled once at import but searched
+# independently: adjacent compliance markings routinely share lines (e.g.
+# the line closing a "Pb\n.*\n" match is the line anchoring "RoHS\n.*\n"),
+# and a single fused alternation is non-overlapping, so it would silently
+# drop the second class in exactly that case.
+_COMPILED_IDENTIFIERS: tuple[Any, ...] = tuple(re2.compile(c) for c in IDENTIFIERS)
+
+# Literal prefix of each identifier (None when a pattern has no literal
+# start), used as a cheap substring prefilter: str.__contains__ is far
+# faster than invoking the regex engine on text that cannot match.
+def _literal_prefixes() -> tuple[str | None, ...]:
+    prefixes: list[str | None] = []
+    for pattern in IDENTIFIERS:
+        prefix_match = re.match(r"[A-Za-z0-9]+", pattern)
+        prefixes.append(prefix_match.group(0) if prefix_match else None)
+    return tuple(prefixes)
+
+_PREFIXES: tuple[str | None, ...] = _literal_prefixes()
+
+def ocr_to_dict(ocr: str) -> dict[str, str | None]:
+    """
+    Map OCR output to a dict of classes using regex patterns.
+
+    Args:
+        ocr (str): The OCR output text.
+
+    Returns:
+        dict: The matched text (or None) for each class.
+    """
+    d: dict[str, str | None] = _TEMPLATE.copy()
+    for key, prefix, pattern in zip(_CLASS_KEYS, _PREFIXES, _COMPILED_IDENTIFIERS):
+        # Skip patterns whose literal prefix does not occur in the text;
+        # most OCR results contain few (often none) of the classes.
+        if prefix is not None and prefix not in ocr:
+            continue
+        match = pattern.search(ocr)
+        if match is not None:
+            d[key] = match.group(0).translate(_NL_TABLE)
+    return d
+
+def ocr_to_json(ocr: str) -> str:
+    """
+    Map OCR output to a JSON object of classes using regex patterns.
+
+    Args:
+        ocr (str): The OCR output text.
+
+    Returns:
+        str: A JSON string representing the mapped classes.
+    """
+    return orjson.dumps(ocr_to_dict(ocr)).decode()
@@ -0,0 +1,30 @@
+"""
+Tests for the OCR-to-class mapping helpers.
+"""
+from ocr_utils import ocr_to_dict
+
+
+def test_adjacent_identifiers_both_match():
+    # The line that closes the Pb match is the same line that anchors the
+    # RoHS match. Both classes must be reported; a non-overlapping fused
+    # scan used to swallow the second one.
+    d = ocr_to_dict("Pb\nRoHS\nCompliant\n")
+    assert d["class_1"] == "Pb-RoHS-"
+    assert d["class_2"] == "RoHS-Compliant-"
+
+
+def test_all_identifiers_match():
+    d = ocr_to_dict("AUTOMOTIVE\nfoo\nPb\nfree\nRoHS\nyes\ne3 HALOGEN\nFREE GREEN")
+    assert d == {
+        "class_0": "AUTOMOTIVE-foo-",
+        "class_1": "Pb-free-",
+        "class_2": "RoHS-yes-",
+        "class_3": "e3",
+        "class_4": "HALOGEN-FREE",
+        "class_5": "GREEN",
+    }
+
+
+def test_no_identifiers_present():
+    d = ocr_to_dict("nothing relevant here")
+    assert all(value is None for value in d.values())